@@ -2,17 +2,54 @@
 Shared context and type definitions for LASV.
 """
 
+import atexit
+import json
 import os
+import sys
+import time
+import weakref
+from collections import Counter
 from dataclasses import dataclass
-from enum import Enum
+from enum import Enum, StrEnum
+from functools import lru_cache
 
 import semver
 import yaml
 from tqdm import tqdm
 
+# Prefer the libyaml-backed implementations when available, they are much
+# faster than the pure-Python ones and accept the same documents.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
-class ChangeType(Enum):
-    """Enumeration for the type of change."""
+# Write buffer size for the context file, the 8 KiB default is too small
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Minimum number of seconds between two non-forced writes of the context file
+SAVE_INTERVAL = 5.0
+
+# Contexts whose pending changes are written at exit. Weak references, so
+# that contexts no longer in use can still be garbage collected.
+_LIVE_CONTEXTS: "weakref.WeakSet[LasvContext]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_contexts() -> None:
+    """Write the pending changes of all live contexts."""
+    for context in list(_LIVE_CONTEXTS):
+        context.flush()
+
+
+# Suffix of OpenRouter free model variants, stripped from stored model keys
+_FREE_SUFFIX = ":free"
+_FREE_LEN = len(_FREE_SUFFIX)
+
+
+class ChangeType(StrEnum):
+    """
+    Enumeration for the type of change. Members compare equal to the
+    severity strings stored in the context.
+    """
     MAJOR = "MAJOR"
     MINOR = "minor"
 
@@ -33,14 +70,32 @@ class BumpType(Enum):
     NONE = "none"
 
 
+def _intern_keys(node: object) -> object:
+    """
+    Return a copy of a loaded YAML tree with interned dict keys. The YAML
+    loader creates a new string for every occurrence of a key, whereas the
+    context repeats the same few keys (releases, diagnosis, severity...)
+    thousands of times.
+    """
+    if isinstance(node, dict):
+        return {
+            sys.intern(k) if isinstance(k, str) else k: _intern_keys(v)
+            for k, v in node.items()
+        }
+    if isinstance(node, list):
+        return [_intern_keys(item) for item in node]
+    return node
+
+
+@lru_cache(maxsize=4096)
 def normalize_model_name(model: str | None) -> str | None:
     """
     Normalize model name for storage so ':free' variants map to the same key.
     """
     if not model:
         return None
-    if model.endswith(":free"):
-        return model[:-5]
+    if model.endswith(_FREE_SUFFIX):
+        return model[:-_FREE_LEN]
     return model
 
 
@@ -52,24 +107,29 @@ def fix_context_data(context: "LasvContext") -> int:
     from lasv import releases
     fixed_count = 0
     crates_data = context.data.get("crates", {})
-    release_entries = []
-    for crate_name, crate_data in crates_data.items():
-        releases_dict = crate_data.get("releases", {})
-        for release_version, release_data in releases_dict.items():
-            release_entries.append((crate_name, release_version, release_data))
+    release_entries = [
+        (crate_name, release_version, release_data)
+        for crate_name, crate_data in crates_data.items()
+        for release_version, release_data
+        in crate_data.get("releases", {}).items()
+        if isinstance(release_data.get("diagnosis"), dict)
+    ]
     for crate_name, release_version, release_data in tqdm(
-        release_entries, desc="Normalizing model keys"
+        release_entries,
+        desc="Normalizing model keys",
+        miniters=max(1, len(release_entries) // 200),
+        mininterval=0.5,
+        smoothing=0.1,
+        disable=None,  # No bar when not on a terminal
     ):
-        diagnosis = release_data.get("diagnosis")
-        if not isinstance(diagnosis, dict):
-            continue
-        prev_version = None
-        for key in list(diagnosis.keys()):
-            if key.endswith(":free"):
-                new_key = normalize_model_name(key)
-                if new_key and new_key != key:
-                    diagnosis[new_key] = diagnosis.pop(key)
-                    fixed_count += 1
+        diagnosis = release_data["diagnosis"]
+        renames = {
+            key: key[:-_FREE_LEN] for key in diagnosis
+            if key.endswith(_FREE_SUFFIX) and len(key) > _FREE_LEN
+        }
+        for key, new_key in renames.items():
+            diagnosis[new_key] = diagnosis.pop(key)
+        fixed_count += len(renames)
         for analyzer_key, analyzer_data in list(diagnosis.items()):
             if analyzer_key == "from_version":
                 continue
@@ -83,17 +143,18 @@ def fix_context_data(context: "LasvContext") -> int:
                 del analyzer_data["from_version"]
                 fixed_count += 1
         if "from_version" not in diagnosis:
-            if prev_version is None:
-                prev_version = releases.find_previous_version(
-                    crate_name, release_version
-                )
+            # Stored releases are only a subset of the published ones, so the
+            # previous stored key is not necessarily the previous release.
+            prev_version = releases.find_previous_version(
+                crate_name, release_version
+            )
             if prev_version:
                 diagnosis["from_version"] = prev_version
                 fixed_count += 1
     return fixed_count
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ChangeInfo:
     """Information about a detected change."""
     severity: ChangeType
@@ -114,22 +175,82 @@ class LasvContext:
         self.model_key: str | None = None
         self.all_releases = False
         self.all_specs = False
-        self.blacklist: set = set()
+        self.blacklist: frozenset[str] = frozenset()
         self.prompt_name: str = "detailed"  # Default prompt name
+        self._dirty: bool = False
+        self._last_save: float = 0.0
+        # JSON copy of the YAML file, much faster to parse. The YAML file
+        # remains the source of truth; the cache is used only while the YAML
+        # file has the exact modification time and size it was made from.
+        self.cache_filename = filename + ".jsoncache"
+        # Never lose throttled changes, even on sys.exit() or Ctrl-C
+        _LIVE_CONTEXTS.add(self)
 
     def load(self):
-        """Load context from YAML file."""
-        if os.path.exists(self.filename):
+        """Load context from YAML file, or from its JSON cache if current."""
+        try:
+            yaml_stat = os.stat(self.filename)
+        except FileNotFoundError:
+            yaml_stat = None
+
+        if yaml_stat is not None:
             print(f"Loading context from {self.filename}...")
-            with open(self.filename, "r", encoding="utf-8") as f:
-                loaded = yaml.safe_load(f)
-                self.data = loaded if loaded else {}
+            loaded = self._load_cache(yaml_stat)
+            if loaded is None:
+                with open(self.filename, "rb") as f:
+                    yaml_stat = os.fstat(f.fileno())
+                    loaded = _intern_keys(
+                        yaml.load(f.read(), Loader=YamlLoader)
+                    )
+                self._save_cache(loaded if loaded else {}, yaml_stat)
+            self.data = loaded if loaded else {}
 
         if 'crates' not in self.data:
             self.data['crates'] = {}
 
         return self.data
 
+    def _load_cache(self, yaml_stat: os.stat_result) -> dict | None:
+        """
+        Return the data in the JSON cache, or None if the cache is missing,
+        unreadable, or was not made from the YAML file as described by
+        yaml_stat (same modification time and size). Comparing for equality
+        also catches YAML files restored with an older modification time.
+        """
+        try:
+            with open(self.cache_filename, "rb") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (not isinstance(cache, dict)
+                or cache.get("yaml_mtime_ns") != yaml_stat.st_mtime_ns
+                or cache.get("yaml_size") != yaml_stat.st_size):
+            return None
+        return cache.get("data")
+
+    def _save_cache(self, data: dict, yaml_stat: os.stat_result) -> None:
+        """
+        Write the JSON cache of data, as read from or written to the YAML
+        file described by yaml_stat. Failure is not fatal, the cache is just
+        discarded.
+        """
+        cache = {
+            "yaml_mtime_ns": yaml_stat.st_mtime_ns,
+            "yaml_size": yaml_stat.st_size,
+            "data": data,
+        }
+        try:
+            with open(self.cache_filename, "w", encoding="utf-8") as f:
+                # Same key order as the YAML file, so that iteration over the
+                # loaded data does not depend on where it came from
+                json.dump(cache, f, separators=(",", ":"), sort_keys=True)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: could not write {self.cache_filename}: {e}")
+            try:
+                os.remove(self.cache_filename)
+            except OSError:
+                pass
+
     def load_config(self, filename: str = "config.yaml") -> None:
         """
         Load optional configuration data.
@@ -137,18 +258,18 @@ class LasvContext:
         - blacklist: list of crate names to skip
         - prompt: name of the prompt to use for LLM analysis
         """
-        if not os.path.exists(filename):
-            return
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                config = yaml.safe_load(f) or {}
+            with open(filename, "rb") as f:
+                config = yaml.load(f.read(), Loader=YamlLoader) or {}
+        except FileNotFoundError:
+            return
         except (OSError, yaml.YAMLError) as e:
             print(f"Warning: could not load {filename}: {e}")
             return
 
         blacklist = config.get("blacklist", [])
         if isinstance(blacklist, list):
-            self.blacklist = {str(name) for name in blacklist}
+            self.blacklist = frozenset(map(str, blacklist))
         else:
             print(f"Warning: {filename} blacklist must be a list.")
 
@@ -167,6 +288,7 @@ class LasvContext:
                 for release in crate_data['releases'].values():
                     if 'diagnosis' in release:
                         del release['diagnosis']
+                        self._dirty = True
                 self.save()
 
     def ensure_release(self, crate: str, version: str) -> None:
@@ -179,6 +301,7 @@ class LasvContext:
             self.data['crates'][crate]['releases'] = {}
         if version not in self.data['crates'][crate]['releases']:
             self.data['crates'][crate]['releases'][version] = {}
+            self._dirty = True
             self.save()
 
     def start_diagnosis(
@@ -202,7 +325,7 @@ class LasvContext:
         if from_version:
             rel_data['diagnosis'].setdefault('from_version', from_version)
         rel_data['diagnosis'][analyzer] = diag_data
-        self.save()
+        self._dirty = True
 
     def add_llm_usage(
         self,
@@ -234,7 +357,7 @@ class LasvContext:
         )
         if cost is not None:
             diag['llm_cost'] = diag.get('llm_cost', 0.0) + cost
-        self.save()
+        self._dirty = True
         return (
             diag.get('llm_spec_chars', 0),
             diag.get('llm_system_chars', 0),
@@ -264,6 +387,7 @@ class LasvContext:
         if change.old_filename:
             change_dict['old_filename'] = change.old_filename
         changes.append(change_dict)
+        self._dirty = True
 
     def finish_diagnosis(
         self, crate: str, prev_version: str, curr_version: str, analyzer: str
@@ -278,13 +402,14 @@ class LasvContext:
             print(f"Non-semver version found: {prev_version} -> {curr_version}")
             raise
 
-        diag = self.data['crates'][crate]['releases'][curr_version]['diagnosis'][analyzer]
-        major_changes = [c for c in diag['changes'] if c['severity'] == "MAJOR"]
-        minor_changes = [c for c in diag['changes'] if c['severity'] == "minor"]
+        diag = self._diag(crate, curr_version, analyzer)
+        severity_counts = Counter(c['severity'] for c in diag['changes'])
+        major_count = severity_counts[ChangeType.MAJOR]
+        minor_count = severity_counts[ChangeType.MINOR]
 
         bump_type = _detect_version_bump(v1, v2)
         compliance, reason = _calculate_compliance(
-            bump_type, major_changes, minor_changes, analyzer
+            bump_type, major_count, minor_count, analyzer
         )
 
         diag['compliant'] = compliance.value
@@ -299,7 +424,8 @@ class LasvContext:
                 del diag['noncompliance']
             print(f"      [{analyzer}: COMPLIANT (strict)]")
 
-        self.save()
+        self._dirty = True
+        self.save(force=True)
 
     def finish_diagnosis_with_error(
         self, crate: str, curr_version: str, analyzer: str, error_message: str
@@ -307,28 +433,67 @@ class LasvContext:
         """
         Keep error status but remove any partial changes.
         """
-        diag = self.data['crates'][crate]['releases'][curr_version] \
-                        ['diagnosis'][analyzer]
+        diag = self._diag(crate, curr_version, analyzer)
         if 'changes' in diag:
             del diag['changes']
         diag['compliant'] = Compliance.ERROR.value
         diag['error_message'] = error_message
         print(f"      [{analyzer}: ERROR] {error_message}")
-        self.save()
+        self._dirty = True
+        self.save(force=True)
+
+    def _diag(self, crate: str, version: str, analyzer: str) -> dict:
+        """Return the existing diagnosis data of an analyzer for a release."""
+        return (
+            self.data['crates'][crate]['releases'][version]
+            ['diagnosis'][analyzer]
+        )
+
+    def mark_dirty(self) -> None:
+        """
+        Record that self.data was modified directly, so that the next save
+        writes it. The methods of this class already do it.
+        """
+        self._dirty = True
+
+    def save(self, force: bool = False) -> None:
+        """
+        Write pending changes to disk, if any. Unless force is True, writes
+        are throttled to one every SAVE_INTERVAL seconds; pending changes are
+        always written at exit.
+        """
+        if not self._dirty:
+            return
+        if force or time.monotonic() - self._last_save >= SAVE_INTERVAL:
+            self._save_now()
 
-    def save(self):
-        """Save context to YAML file, with backup on failure."""
-        old_filename = self.filename + ".old"
-        if os.path.exists(self.filename):
-            os.rename(self.filename, old_filename)
+    def flush(self) -> None:
+        """Write pending changes, if any, without throttling."""
+        self.save(force=True)
 
+    def _save_now(self) -> None:
+        """
+        Save context to YAML file. The data is written to a temporary file
+        that then atomically replaces the previous one, so an interrupted
+        save never leaves a truncated file behind.
+        """
+        tmp_filename = self.filename + ".tmp"
         try:
-            with open(self.filename, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.data, f)
+            with open(tmp_filename, "w", encoding="utf-8",
+                      buffering=WRITE_BUFFER_SIZE) as f:
+                yaml.dump(self.data, f, Dumper=YamlDumper)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_filename, self.filename)
         except Exception as e:
-            if os.path.exists(old_filename):
-                os.rename(old_filename, self.filename)  # Restore the old file
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
             raise e
+        self._save_cache(self.data, os.stat(self.filename))
+        self._dirty = False
+        self._last_save = time.monotonic()
 
 
 def _detect_version_bump(v1: semver.Version, v2: semver.Version) -> BumpType:
@@ -363,8 +528,8 @@ def _detect_version_bump(v1: semver.Version, v2: semver.Version) -> BumpType:
 
 def _calculate_compliance(
     bump_type: BumpType,
-    major_changes: list,
-    minor_changes: list,
+    major_count: int,
+    minor_count: int,
     analyzer: str
 ) -> tuple[Compliance, str]:
     """
@@ -375,18 +540,18 @@ def _calculate_compliance(
     reason = ""
 
     if bump_type == BumpType.MAJOR:
-        if not major_changes and analyzer != 'files':
+        if major_count == 0 and analyzer != 'files':
             compliance = Compliance.LAX
             reason = "Major version bump but no MAJOR changes found."
     elif bump_type == BumpType.MINOR:
-        if major_changes:
+        if major_count > 0:
             compliance = Compliance.NO
             reason = "Minor version bump but MAJOR changes found."
-        elif not minor_changes and analyzer != 'files':
+        elif minor_count == 0 and analyzer != 'files':
             compliance = Compliance.LAX
             reason = "Minor version bump but no minor changes found."
     elif bump_type == BumpType.PATCH:
-        if major_changes or minor_changes:
+        if major_count > 0 or minor_count > 0:
             compliance = Compliance.NO
             reason = "Patch version bump but API changes found."
 
@@ -1,39 +1,49 @@
 """
 This module handles the listing and processing of Alire crates.
 """
+import os
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from lasv.context import LasvContext
 from lasv import releases
 from lasv import colors
+from lasv import fastjson
 
+# Concurrent `alr show` processes when listing all crates
+MAX_SHOW_WORKERS = min(32, (os.cpu_count() or 1) * 4)
 
-def list_crate(context: 'LasvContext', crate_name: str) -> None:
+
+def _show_crate(crate_name: str) -> dict | None:
     """
-    Retrieve information about a single crate using 'alr show' and add it to context.
+    Retrieve information about a single crate using 'alr show'.
+    Safe to call from worker threads, as it does not touch the context.
 
     Args:
-        context: The LasvContext to store the crate information in
         crate_name: The name of the crate to query
+
+    Returns:
+        The crate entry to be stored in the context, or None if alr could
+        not be run or failed, in which case nothing must be stored
     """
     is_external = False
     is_binary = False
     crate_entry = {}
 
-    # If the crate is already listed, skip it
-    if 'crates' in context.data and crate_name in context.data['crates']:
-        print(f"Crate {crate_name} already listed in context.")
-        return
-
     try:
         show_result = subprocess.run(
-            ["alr", "--format", "show", crate_name],
+            [releases.ALR, "--format", "show", crate_name],
             capture_output=True,
-            text=True,
             check=True
         )
-        show_info = json.loads(show_result.stdout)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error running alr show for crate {crate_name}: {e}")
+        return None
+
+    stdout = show_result.stdout
+    try:
+        show_info = fastjson.loads(stdout)
 
         origins = show_info.get('origin', [])
         for origin in origins:
@@ -44,8 +54,8 @@ def list_crate(context: 'LasvContext', crate_name: str) -> None:
         # Add the 'version' field under the crate name, as 'last_version'
         crate_entry['last_version'] = show_info.get('version')
 
-    except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as e:
-        if show_result.stdout == '' or 'external' in show_result.stdout:
+    except json.JSONDecodeError as e:
+        if stdout == b'' or b'external' in stdout:
             is_external = True
         else:
             print(f"Error checking crate {crate_name}: {e}")
@@ -53,11 +63,32 @@ def list_crate(context: 'LasvContext', crate_name: str) -> None:
         crate_entry['binary'] = is_binary
         crate_entry['external'] = is_external
 
+    return crate_entry
+
+
+def list_crate(context: 'LasvContext', crate_name: str) -> None:
+    """
+    Retrieve information about a single crate using 'alr show' and add it to context.
+
+    Args:
+        context: The LasvContext to store the crate information in
+        crate_name: The name of the crate to query
+    """
+    # If the crate is already listed, skip it
+    if 'crates' in context.data and crate_name in context.data['crates']:
+        print(f"Crate {crate_name} already listed in context.")
+        return
+
+    crate_entry = _show_crate(crate_name)
+    if crate_entry is None:
+        return
+
     # Initialize 'crates' dict if it doesn't exist
     if 'crates' not in context.data:
         context.data['crates'] = {}
 
     context.data['crates'][crate_name] = crate_entry
+    context.mark_dirty()
 
 
 def list_crates(context : 'LasvContext'):
@@ -73,12 +104,11 @@ def list_crates(context : 'LasvContext'):
 
     try:
         result = subprocess.run(
-            ["alr", "--format", "search", "--crates"],
+            [releases.ALR, "--format", "search", "--crates"],
             capture_output=True,
-            text=True,
             check=True
         )
-        crates_info = json.loads(result.stdout)
+        crates_info = fastjson.loads(result.stdout)
         print(f"Listed {len(crates_info)} crates using alr.")
 
     except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as e:
@@ -90,12 +120,35 @@ def list_crates(context : 'LasvContext'):
     context.data['crates'] = {}
 
     # Go over crate.name and use `alr show` to check if it is binary. A crate
-    # is binary if its 'origin' contains a 'case(*)' key.
-    for crate in tqdm(crates_info, desc="Identifying source crates"):
-        crate_name = crate.get('name')
-        list_crate(context, crate_name)
-
-    context.save()
+    # is binary if its 'origin' contains a 'case(*)' key. Each `alr show` is
+    # dominated by process startup, so run them concurrently; the context is
+    # only updated from this thread.
+    crate_names = [crate.get('name') for crate in crates_info]
+    crate_entries = {}
+    with ThreadPoolExecutor(max_workers=MAX_SHOW_WORKERS) as executor:
+        futures = {
+            executor.submit(_show_crate, crate_name): crate_name
+            for crate_name in crate_names
+        }
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            desc="Identifying source crates",
+            miniters=max(1, len(futures) // 200),
+            mininterval=0.25,
+            smoothing=0.1,
+            disable=None,  # No bar when not on a terminal
+        ):
+            crate_entries[futures[future]] = future.result()
+
+    # Store the crates in listing order, not in completion order
+    for crate_name in crate_names:
+        crate_entry = crate_entries.get(crate_name)
+        if crate_entry is not None:
+            context.data['crates'][crate_name] = crate_entry
+
+    context.mark_dirty()
+    context.save(force=True)
     # Crates with binary or external set to True are not source crates:
     source_crates = {
         name: info for name, info in context.data['crates'].items()
@@ -143,5 +196,6 @@ def process(
         total_major += major
         total_minor += minor
         total_patch += patch
+        context.save()
 
     print(f"Total release pairs: {total_pairs} ({total_major} major, {total_minor} minor, {total_patch} patch)")
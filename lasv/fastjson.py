@@ -0,0 +1,17 @@
+"""
+This module provides JSON encoding and decoding, using orjson when it is
+installed and the standard library otherwise. loads accepts bytes, so there
+is no need to decode subprocess or HTTP output beforehand, and dumps returns
+UTF-8 bytes ready to be sent. Decoding errors are json.JSONDecodeError in
+both cases.
+"""
+# pylint: disable=unused-import
+try:
+    from orjson import dumps, loads
+except ImportError:
+    import json
+    from json import loads
+
+    def dumps(obj: object) -> bytes:
+        """Encode obj as compact JSON in UTF-8."""
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
@@ -5,11 +5,42 @@ This module handles the querying of LLMs through the OpenRouter API.
 import os
 import sys
 import json
+import random
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
 import requests
-from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
 from lasv import prompts
 from lasv import colors
+from lasv import fastjson
+from lasv import llm_cache
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# (connect, read) timeouts in seconds
+REQUEST_TIMEOUT = (5, 60)
+
+# 4xx statuses that are worth retrying; other 4xx (bad key, bad model...)
+# will fail again. All 5xx statuses are retried.
+RETRYABLE_4XX = frozenset({408, 425, 429})
+
+# Length of each prompt, reported as the system chars of every query
+_PROMPT_CHARS = {
+    name: len(prompt) for name, prompt in prompts.INSTRUCTIONS.items()
+}
+
+# Maximum number of queries in flight at once, see query_models
+MAX_CONCURRENT_QUERIES = 8
+
+# Shared session, so consecutive queries reuse the same TLS connection.
+# Retries are handled by query_model, not by the adapter.
+_SESSION = requests.Session()
+_SESSION.headers["Content-Type"] = "application/json"
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=MAX_CONCURRENT_QUERIES,
+    pool_maxsize=MAX_CONCURRENT_QUERIES,
+))
 
 
 @dataclass(frozen=True)
@@ -20,43 +51,173 @@ class LlmUsage:
     cost: float | None
 
 
+def _retry_delay(
+    prev_delay: float,
+    base_delay: float,
+    max_delay: float,
+    response: requests.Response | None = None,
+) -> float:
+    """
+    Return the delay before the next retry, using decorrelated jitter so
+    that concurrent queries do not retry in lockstep. A Retry-After header
+    in seconds, as sent with 429 responses, is honored up to max_delay.
+    """
+    delay = min(max_delay, random.uniform(base_delay, prev_delay * 3))
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+            delay = max(delay, min(retry_after, max_delay))
+        except ValueError:
+            pass  # Missing, or an HTTP date
+    return delay
+
+
 def query_model(
     model: str, spec1_content: str, spec2_content: str, prompt_name: str = "detailed"
 ) -> tuple[str, LlmUsage]:
     """
     Query an LLM model through the OpenRouter API to compare two specs.
-    Implements exponential backoff retry for 4xx and 5xx errors.
+    Implements backoff retry for 5xx and transient 4xx errors.
     Returns the response content and usage details.
+    Responses to identical queries made earlier in the run, or cached on
+    disk, are returned with a cost of 0, as nothing is paid for them.
     """
-    api_key = os.environ.get("OPENROUTER_API_KEY")
-
     prompt = prompts.INSTRUCTIONS[prompt_name]
-    user_content = f"OLD:\n{spec1_content}\n\nNEW:\n{spec2_content}"
-    sent_system_chars = len(prompt)
     sent_spec_chars = len(spec1_content) + len(spec2_content)
+    sent_system_chars = _PROMPT_CHARS[prompt_name]
+
+    cache_key = llm_cache.make_key(model, prompt, spec1_content, spec2_content)
+    content = _cached_content(cache_key)
+    if content is not None:
+        return content, LlmUsage(sent_spec_chars, sent_system_chars, 0.0)
+
+    content, total_cost = _post_query(
+        _request_body(model, prompt, spec1_content, spec2_content)
+    )
+    llm_cache.put(cache_key, {"content": content, "cost": total_cost})
+    return content, LlmUsage(sent_spec_chars, sent_system_chars, total_cost)
+
+
+def _cached_content(cache_key: str) -> str | None:
+    """
+    Return the cached response content for a query, or None if not cached.
+    """
+    cached = llm_cache.get(cache_key)
+    if cached is None:
+        return None
+    print(colors.lilac("         Using cached LLM response"))
+    return cached["content"]
+
+
+def _request_body(
+    model: str, prompt: str, spec1_content: str, spec2_content: str
+) -> bytes:
+    """
+    Return the encoded body of a query. It is built once, as it does not
+    change between retries.
+    The system prompt is the same for every query, so it is marked as
+    cacheable for providers that need explicit hints (e.g. Anthropic);
+    others ignore the hint or cache common prefixes on their own.
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": [{
+                    "type": "text",
+                    "text": prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }],
+            },
+            {
+                "role": "user",
+                "content": "OLD:\n" + spec1_content
+                           + "\n\nNEW:\n" + spec2_content,
+            },
+        ],
+    }
+    return fastjson.dumps(payload)
+
+
+def _response_content(
+    response: requests.Response
+) -> tuple[str, float | None]:
+    """
+    Return the content and cost of a successful query response.
+    Raises RequestException, to be retried, if the response is not valid.
+    """
+    try:
+        result = fastjson.loads(response.content)
+    except json.JSONDecodeError as e:
+        # Possibly truncated, retry as for other network errors
+        raise requests.exceptions.RequestException(
+            f"Invalid JSON response: {e}"
+        ) from e
+    if "choices" in result and result["choices"]:
+        usage = result.get("usage", {}) if isinstance(result, dict) else {}
+        total_cost = None
+        if isinstance(usage, dict):
+            if "total_cost" in usage:
+                total_cost = usage.get("total_cost")
+            elif "cost" in usage:
+                total_cost = usage.get("cost")
+        return result["choices"][0]["message"]["content"], total_cost
+
+    # Got a response but without expected structure - extract error code if available
+    error_code = result.get("error", {}).get("code") if isinstance(result.get("error"), dict) else None
+
+    print(colors.yellow(f"Error: Unexpected response from OpenRouter API: {result}"))
+
+    # Raise RequestException to trigger backoff (caught by RequestException handler)
+    # Include error code in message if available
+    error_msg = f"Unexpected API response structure (error code: {error_code})" if error_code else "Unexpected API response structure"
+    raise requests.exceptions.RequestException(error_msg)
+
+
+def _http_error_text(e: requests.exceptions.HTTPError) -> str:
+    """
+    Return a description of an HTTP error for messages. Exits if the error
+    is not worth retrying.
+    """
+    # Error responses are falsy, so compare against None explicitly
+    status_code = e.response.status_code if e.response is not None else None
+
+    # Retry transient HTTP errors, including when status is missing.
+    retryable = (
+        status_code is None
+        or status_code in RETRYABLE_4XX
+        or 500 <= status_code < 600
+    )
+    if not retryable:
+        print(colors.red(f"Error: Non-retryable HTTP {status_code} error: {e}"))
+        sys.exit(1)
+    return "HTTP error" if status_code is None else f"HTTP {status_code} error"
+
+
+def _post_query(body: bytes) -> tuple[str, float | None]:
+    """
+    Send a query, retrying transient failures with backoff.
+    Returns the response content and cost; exits if the query fails.
+    """
+    headers = {
+        "Authorization": f"Bearer {os.environ.get('OPENROUTER_API_KEY')}"
+    }
 
     # Retry configuration
-    max_retries = 6  # Will give us: 1s, 2s, 4s, 8s, 16s, 32s, 60s (capped)
+    max_retries = 6  # Randomized delays, growing up to 3x each retry
     retry_count = 0
     base_delay = 1  # Start with 1 second
     max_delay = 60  # Maximum 1 minute backoff
+    delay = base_delay
 
     while retry_count <= max_retries:
         try:
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                },
-                data=json.dumps({
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": prompt},
-                        {"role": "user", "content": user_content}
-                    ]
-                }),
-                timeout=30
+            response = _SESSION.post(
+                OPENROUTER_URL,
+                headers=headers,
+                data=body,
+                timeout=REQUEST_TIMEOUT
             )
 
             # Check status code first, before parsing response
@@ -64,76 +225,74 @@ def query_model(
                 # Trigger HTTPError to reuse backoff logic
                 response.raise_for_status()
 
-            result = response.json()
-            if "choices" in result and result["choices"]:
-                usage = result.get("usage", {}) if isinstance(result, dict) else {}
-                total_cost = None
-                if isinstance(usage, dict):
-                    if "total_cost" in usage:
-                        total_cost = usage.get("total_cost")
-                    elif "cost" in usage:
-                        total_cost = usage.get("cost")
-                return (
-                    result["choices"][0]["message"]["content"],
-                    LlmUsage(
-                        spec_chars=sent_spec_chars,
-                        system_chars=sent_system_chars,
-                        cost=total_cost,
-                    ),
-                )
-
-            # Got a response but without expected structure - extract error code if available
-            error_code = result.get("error", {}).get("code") if isinstance(result.get("error"), dict) else None
-
-            print(colors.yellow(f"Error: Unexpected response from OpenRouter API: {result}"))
-
-            # Raise RequestException to trigger backoff (caught by RequestException handler)
-            # Include error code in message if available
-            error_msg = f"Unexpected API response structure (error code: {error_code})" if error_code else "Unexpected API response structure"
-            raise requests.exceptions.RequestException(error_msg)
+            return _response_content(response)
 
         except requests.exceptions.HTTPError as e:
-            status_code = e.response.status_code if e.response else None
-
-            # Treat HTTP errors as retryable, including when status is missing.
-            if retry_count < max_retries and (status_code is None or 400 <= status_code < 600):
-                delay = min(base_delay * (2 ** retry_count), max_delay)
+            status_text = _http_error_text(e)
+            if retry_count < max_retries:
+                delay = _retry_delay(delay, base_delay, max_delay, e.response)
                 retry_count += 1
-                if status_code is None:
-                    status_text = "HTTP error"
-                else:
-                    status_text = f"HTTP {status_code} error"
                 print(colors.red(f"{status_text} from OpenRouter API: {e}"))
                 print(colors.yellow(f"{status_text} from OpenRouter API. "
-                      f"Retrying in {delay} seconds... (attempt {retry_count}/{max_retries})"))
+                      f"Retrying in {delay:.1f} seconds... (attempt {retry_count}/{max_retries})"))
                 time.sleep(delay)
                 continue
 
-            if status_code is None:
-                print(colors.red(f"Error: Maximum retries reached after HTTP error: {e}"))
-            else:
-                print(colors.red(
-                    f"Error: Maximum retries reached after HTTP {status_code} error: {e}"
-                ))
+            print(colors.red(
+                f"Error: Maximum retries reached after {status_text}: {e}"
+            ))
             sys.exit(1)
 
         except requests.exceptions.RequestException as e:
             # Network errors, timeouts, etc. - also retry these
             if retry_count < max_retries:
-                delay = min(base_delay * (2 ** retry_count), max_delay)
+                delay = _retry_delay(delay, base_delay, max_delay)
                 retry_count += 1
                 print(colors.yellow(f"Network error: {e}. "
-                      f"Retrying in {delay} seconds... (attempt {retry_count}/{max_retries})"))
+                      f"Retrying in {delay:.1f} seconds... (attempt {retry_count}/{max_retries})"))
                 time.sleep(delay)
                 continue
-            else:
-                print(colors.red(f"Error: Maximum retries reached after network error: {e}"))
-                sys.exit(1)
-
-        except json.JSONDecodeError:
-            print(colors.red(f"Error decoding JSON response from OpenRouter API: {response.text}"))
+            print(colors.red(f"Error: Maximum retries reached after network error: {e}"))
             sys.exit(1)
 
     # Should not reach here, but just in case
     print(colors.red("Error: Unexpected exit from retry loop"))
     sys.exit(1)
+
+
+def query_models(
+    model: str, spec_pairs: list[tuple[str, str]], prompt_name: str = "detailed"
+) -> list[tuple[str, LlmUsage]]:
+    """
+    Query a model for several (old, new) spec pairs concurrently.
+    Queries are network-bound, so up to MAX_CONCURRENT_QUERIES of them are
+    kept in flight. Identical pairs are queried once, and the repeats are
+    returned with a cost of 0. Results are returned in the same order as
+    spec_pairs.
+    """
+    keys = [
+        llm_cache.make_key(model, prompts.INSTRUCTIONS[prompt_name], old, new)
+        for old, new in spec_pairs
+    ]
+    unique_pairs = dict(zip(keys, spec_pairs))
+
+    def query(pair: tuple[str, str]) -> tuple[str, LlmUsage]:
+        return query_model(model, pair[0], pair[1], prompt_name)
+
+    if len(unique_pairs) <= 1:
+        responses = [query(pair) for pair in unique_pairs.values()]
+    else:
+        workers = min(MAX_CONCURRENT_QUERIES, len(unique_pairs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            responses = list(executor.map(query, unique_pairs.values()))
+    by_key = dict(zip(unique_pairs, responses))
+
+    results = []
+    seen = set()
+    for key in keys:
+        response, usage = by_key[key]
+        if key in seen:
+            usage = replace(usage, cost=0.0)
+        seen.add(key)
+        results.append((response, usage))
+    return results
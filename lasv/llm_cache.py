@@ -0,0 +1,87 @@
+"""
+This module implements a cache of LLM responses.
+
+Responses are always kept in memory for the duration of the run, so that
+identical queries (e.g. specs vendored verbatim by several crates) are
+only paid once; hits are reported with no cost. The on-disk cache is
+optional: it is enabled by setting LASV_CACHE=1, and is meant for
+development loops that re-run the same analyses.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "lasv",
+    "llm",
+)
+
+# Entries older than this (in seconds) are ignored
+MAX_AGE = 30 * 86400
+
+# Entries of the current run, by key
+_MEMORY: dict[str, dict] = {}
+
+
+def enabled() -> bool:
+    """Return whether the on-disk response cache is enabled."""
+    return os.environ.get("LASV_CACHE") == "1"
+
+
+def make_key(model: str, prompt: str, spec1: str, spec2: str) -> str:
+    """
+    Return the cache key for a query. The full prompt text is part of the
+    key, so editing a prompt invalidates its cached responses.
+    """
+    digest = hashlib.sha256()
+    for part in (model, prompt, spec1, spec2):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    """Return the path of the file storing the entry for a key."""
+    return os.path.join(CACHE_DIR, key[:2], key + ".json")
+
+
+def get(key: str) -> dict | None:
+    """
+    Return the cached entry for a key, or None if missing or expired.
+    """
+    entry = _MEMORY.get(key)
+    if entry is not None or not enabled():
+        return entry
+    try:
+        with open(_entry_path(key), "rb") as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > MAX_AGE:
+                return None
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _MEMORY[key] = entry
+    return entry
+
+
+def put(key: str, entry: dict) -> None:
+    """
+    Store an entry for a key. Failures only print a warning, as the cache is
+    an optimization. Safe to call from several threads at once.
+    """
+    _MEMORY[key] = entry
+    if not enabled():
+        return
+    path = _entry_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=os.path.dirname(path),
+            suffix=".tmp", delete=False
+        ) as f:
+            json.dump(entry, f)
+        os.replace(f.name, path)
+    except OSError as e:
+        print(f"Warning: could not cache LLM response: {e}")
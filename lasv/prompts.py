@@ -1,6 +1,7 @@
 """
 This file contains prompts for the LLMs that perform the semver comparisons
 """
+from types import MappingProxyType
 
 COMMON_OUTPUT = """
 For every spec change detected, output only lines strictly adhering to these formats:
@@ -15,7 +16,8 @@ minor (line, col): description
 Do not emit any other text or summary.
 """
 
-INSTRUCTIONS = {
+# Read-only, as the LLM module precomputes data for each prompt at import
+INSTRUCTIONS = MappingProxyType({
     "simple": """
 You are a semantic versioning assistant. Compare the "OLD" and "NEW" Ada package specifications.
 Identify API changes in the public part (backward compatible "minor" or incompatible "MAJOR").
@@ -68,4 +70,4 @@ Changes that MUST be ignored, as they're not relevant for semantic versioning:
 
 Report your findings using the format specified below.
 """ + COMMON_OUTPUT,
-}
+})
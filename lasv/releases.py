@@ -6,8 +6,11 @@ import os
 import re
 import shutil
 import subprocess
-import semver
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 import semver
 
@@ -22,111 +25,217 @@ from lasv.context import (
 from lasv import specs as specs_module
 from lasv.specs import SpecComparisonResult
 from lasv import colors
+from lasv import llm
+from lasv import fastjson
+
+# alr executable, looked up in PATH once. If missing, running "alr" keeps
+# raising FileNotFoundError where it is handled.
+ALR = shutil.which("alr") or "alr"
 
 
+@lru_cache(maxsize=4096)
 def get_release_path(crate: str, version: str) -> str:
     """
     Helper to get the local path where a release is stored.
     Downloads it if not present is NOT handled here, it assumes retrieve() was called.
     But we need to know the directory name alure uses.
     """
-    # We re-run alr get --dirname to know the folder name.
-    # This is slightly inefficient but safe.
+    parent_path = os.path.join("releases", crate)
+    dirname = _find_release_dirname(parent_path, crate, version)
+    if dirname is not None:
+        return os.path.join(parent_path, dirname)
+
+    # We run alr get --dirname to know the folder name. The name does not
+    # depend on whether the release is already downloaded, so it is cached.
     result = subprocess.run(
-        ["alr", "get", "--dirname", f"{crate}={version}"],
+        [ALR, "get", "--dirname", f"{crate}={version}"],
         capture_output=True,
-        text=True,
         check=True
     )
-    return os.path.join("releases", crate, result.stdout.strip())
+    return os.path.join("releases", crate, os.fsdecode(result.stdout.strip()))
+
+
+# Folders excluded from spec discovery (compared in lowercase)
+EXCLUDED_FOLDERS = frozenset({
+    'demo', 'demos',
+    'example', 'examples',
+    'impl', 'implementation',
+    'private', 'priv',
+    'prover', 'provers', 'proof', 'proofs',
+    'test', 'tester', 'tests', 'testsuite', 'testsuites',
+})
+
+
+def _find_release_dirname(
+    parent_path: str, crate: str, version: str
+) -> Optional[str]:
+    """
+    Return the folder name of an already downloaded release, if exactly one
+    folder in parent_path follows alr's {crate}_{version}_{hash} naming for
+    it. The hash differs for each release, so it cannot be derived from
+    other versions.
+    """
+    pattern = re.compile(rf"{re.escape(crate)}_{re.escape(version)}_[a-f0-9]+")
+    try:
+        with os.scandir(parent_path) as entries:
+            matches = [
+                entry.name for entry in entries
+                if entry.is_dir() and pattern.fullmatch(entry.name)
+            ]
+    except OSError:
+        return None
+    return matches[0] if len(matches) == 1 else None
 
 
-def get_specs(release_path: str) -> dict[str, str]:
+@lru_cache(maxsize=64)
+def get_specs(release_path: str) -> Mapping[str, str]:
     """
     Scans the release path for *.ads files in immediate 'src' or 'source'
     subdirectories.
-    Returns a dict mapping {filename: full_path}.
-    Excludes folders named: test, tests, testsuite, demo, example, examples,
-    prover, proof, proofs.
-    """
-    # Folders to exclude (case-insensitive)
-    excluded_folders = {
-        'demo', 'demos',
-        'example', 'examples',
-        'impl', 'implementation',
-        'private', 'priv',
-        'prover', 'provers', 'proof', 'proofs',
-        'test', 'tester', 'tests', 'testsuite', 'testsuites',
-    }
-
+    Returns a read-only mapping {filename: full_path}. It is cached, as the
+    same release is scanned for the 'files' and model diagnoses, and as the
+    older end of a pair and the newer end of the next one.
+    Excludes hidden folders and folders named: test, tests, testsuite, demo,
+    example, examples, prover, proof, proofs.
+    """
     specs = {}
     for subdir in ["src", "source"]:
-        dir_path = os.path.join(release_path, subdir)
-        if os.path.exists(dir_path):
-            for root, dirs, files in os.walk(dir_path):
-                # Filter out excluded directories (modifying dirs in-place affects os.walk)
-                dirs[:] = [d for d in dirs if d.lower() not in excluded_folders]
-
-                # Check if current directory itself should be excluded
-                current_dir_name = os.path.basename(root).lower()
-                if current_dir_name in excluded_folders:
-                    continue
+        _scan_specs(os.path.join(release_path, subdir), specs)
+    return MappingProxyType(specs)
 
-                for file in files:
-                    if file.endswith(".ads"):
-                        # We use file name as key. Ambiguity if same filename
-                        # in different subfolders is ignored for now.
-                        specs[file] = os.path.join(root, file)
-    return specs
 
-
-def is_private_package(spec_path: str) -> bool:
+def _scan_specs(dir_path: str, specs: dict[str, str]) -> None:
     """
-    Check if a spec file declares a private package.
-    Returns True if 'private' keyword appears before 'package' keyword.
-    Handles multi-line declarations and generic packages.
+    Add the *.ads files under dir_path to specs, skipping excluded folders.
+    Entries are visited in the same order os.walk would use, with the file
+    type taken from the directory entry instead of a stat per file.
     """
+    subdirs = []
     try:
-        with open(spec_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if (not entry.name.startswith(".")
+                            and entry.name.lower() not in EXCLUDED_FOLDERS):
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(".ads"):
+                    # We use file name as key. Ambiguity if same filename
+                    # in different subfolders is ignored for now.
+                    specs[entry.name] = entry.path
+    except OSError:
+        return
+
+    for subdir_path in subdirs:
+        _scan_specs(subdir_path, specs)
+
+
+# Concurrent `alr get` downloads in retrieve_all
+MAX_RETRIEVE_WORKERS = 4
 
-        # Remove comments (-- to end of line)
-        lines = content.split('\n')
-        cleaned_lines = []
-        for line in lines:
-            comment_pos = line.find('--')
-            if comment_pos >= 0:
-                line = line[:comment_pos]
-            cleaned_lines.append(line)
+# Concurrent spec reads in compare_spec_batch; they wait on I/O, so more
+# threads than cores are useful
+MAX_SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Fewer spec reads than this are done inline, as starting threads would cost
+# more than it saves (e.g. for the single pairs of an early-stop comparison)
+MIN_PREFETCH_PATHS = 4
+
+# Bytes read at a time when comparing spec files
+COMPARE_CHUNK_BYTES = 64 * 1024
+
+# Tokens looked for by is_private_package: comments, to be skipped, or one
+# of the keywords (group 1), possibly followed by "with" (group 2), with
+# whitespace and comments allowed in between.
+SPEC_TOKEN_RE = re.compile(
+    rb'--[^\n]*|\b(private|generic|package)\b((?:\s|--[^\n]*)+with\b)?',
+    re.IGNORECASE
+)
 
-        cleaned_content = ' '.join(cleaned_lines).lower()
+# Whitespace and comments, as allowed between "private" and "with"
+SPEC_GAP_RE = re.compile(rb'(?:\s|--[^\n]*)*')
 
-        # Remove extra whitespace
-        cleaned_content = re.sub(r'\s+', ' ', cleaned_content)
+# A keyword closer than this to the end of a partial read could be cut,
+# or be followed by a "with" not read yet.
+SPEC_TOKEN_MARGIN = 64
 
-        # Remove "private with", which are not package privacy indicators
-        cleaned_content = re.sub(r'private with', '', cleaned_content)
+# Bytes read at first by is_private_package; the package declaration is
+# almost always found within them.
+SPEC_HEAD_BYTES = 8192
 
-        # Find positions of 'private', 'generic', 'package' keywords
-        # Use word boundaries to avoid matching substrings
-        private_match = re.search(r'\bprivate\b', cleaned_content)
-        generic_match = re.search(r'\bgeneric\b', cleaned_content)
-        package_match = re.search(r'\bpackage\b', cleaned_content)
 
-        # Private must come before generic, not to be confused with "is private"
-        # or "with private" formal specifications.
-        if generic_match and private_match:
-            if private_match.start() > generic_match.start():
-                private_match = None  # Ignore this private occurrence
+def is_private_package(spec_path: str) -> bool:
+    """
+    Check if a spec file declares a private package.
+    Returns True if 'private' keyword appears before 'package' keyword.
+    Handles multi-line declarations and generic packages.
+    Results are cached for as long as the file is not modified.
+    """
+    return _is_private_package(spec_path, _stat_key(spec_path))
 
-        if private_match and package_match:
-            return private_match.start() < package_match.start()
 
+@lru_cache(maxsize=16384)
+def _is_private_package(
+    spec_path: str, stat_key: Optional[tuple[int, int]]
+) -> bool:
+    """
+    Uncached is_private_package, for a file already stat'ed; the stat key
+    is only part of the cache key, and is None if the file does not exist.
+    """
+    if stat_key is None:
         return False
-    except (FileNotFoundError, UnicodeDecodeError):
+    # The keywords are ASCII, so the raw bytes are scanned without decoding
+    # them, whatever the encoding of the file.
+    try:
+        with open(spec_path, 'rb') as f:
+            content = f.read(SPEC_HEAD_BYTES)
+            complete = len(content) < SPEC_HEAD_BYTES
+            result = _declares_private_package(content, complete)
+            if result is None and not complete:
+                # Undecided from the head, look at the whole file
+                result = _declares_private_package(content + f.read(), True)
+        return bool(result)
+    except FileNotFoundError:
         return False
 
 
+def _declares_private_package(
+    content: bytes, complete: bool
+) -> Optional[bool]:
+    """
+    Check whether Ada source declares a private package, i.e. whether a
+    'private' keyword comes before the 'package' one. The source is scanned
+    forward and only up to the 'package' keyword.
+    Returns None if there is no 'package' keyword, or if content is not
+    complete and the answer could depend on what follows.
+    """
+    private_found = False
+    for match in SPEC_TOKEN_RE.finditer(content):
+        keyword = match.group(1)
+        if keyword is None:
+            continue  # Comment
+        if not complete and match.end() > len(content) - SPEC_TOKEN_MARGIN:
+            return None
+        keyword = keyword.lower()
+        if keyword == b'private':
+            # A partial read ending in comments could cut a "with"
+            if (not complete and match.group(2) is None
+                    and SPEC_GAP_RE.match(content, match.end()).end()
+                    == len(content)):
+                return None
+            # "private with" clauses are not package privacy indicators
+            if match.group(2) is None:
+                private_found = True
+        elif keyword == b'generic':
+            # Private must come before generic, not to be confused with
+            # "is private" or "with private" formal specifications.
+            if not private_found:
+                return False
+        else:
+            return private_found
+
+    return None
+
+
 def compare_specs(
     context: "LasvContext",
     crate: str,
@@ -157,7 +266,7 @@ def compare_specs(
     specs_v1 = get_specs(path_v1)
     specs_v2 = get_specs(path_v2)
 
-    all_specs = sorted(set(specs_v1.keys()) | set(specs_v2.keys()))
+    all_specs = sorted(specs_v1.keys() | specs_v2.keys())
     bump_type = None
     if context.model and not context.all_specs:
         try:
@@ -174,25 +283,41 @@ def compare_specs(
     specs_analyzed_count = 0
     specs_skipped_count = 0
     total_specs_count = len(all_specs)
-    for idx, spec in enumerate(all_specs):
-        p1 = specs_v1.get(spec)
-        p2 = specs_v2.get(spec)
-        result = compare_spec_files(context, crate, v2, p1, p2)
-        has_major = has_major or result.has_major
-        has_minor = has_minor or result.has_minor
-        if result.sent_to_llm:
-            specs_analyzed_count += 1
-        else:
-            specs_skipped_count += 1
+    # When the bump type allows an early stop, specs are compared one at a
+    # time so that no query is paid for past the stop; unchanged and private
+    # specs are still filtered out before querying. Otherwise LLM queries
+    # are issued concurrently for a batch of specs, and without a model all
+    # specs form a single batch.
+    if bump_type is not None:
+        batch_size = 1
+    elif context.model:
+        batch_size = llm.MAX_CONCURRENT_QUERIES
+    else:
+        batch_size = max(1, total_specs_count)
+    for start in range(0, total_specs_count, batch_size):
+        batch = all_specs[start:start + batch_size]
+        results = compare_spec_batch(
+            context, crate, v2,
+            [(specs_v1.get(spec), specs_v2.get(spec)) for spec in batch],
+            prompt_name,
+        )
+        for result in results:
+            has_major = has_major or result.has_major
+            has_minor = has_minor or result.has_minor
+            if result.sent_to_llm:
+                specs_analyzed_count += 1
+            else:
+                specs_skipped_count += 1
 
+        batch_end = start + len(batch)
         if bump_type == BumpType.MINOR and has_major:
-            all_specs_analyzed = idx == len(all_specs) - 1
+            all_specs_analyzed = batch_end == total_specs_count
             break
         if bump_type == BumpType.PATCH and (has_major or has_minor):
-            all_specs_analyzed = idx == len(all_specs) - 1
+            all_specs_analyzed = batch_end == total_specs_count
             break
         if bump_type == BumpType.MAJOR and has_major:
-            all_specs_analyzed = idx == len(all_specs) - 1
+            all_specs_analyzed = batch_end == total_specs_count
             break
 
     diagnosis = (
@@ -208,62 +333,97 @@ def compare_specs(
         diagnosis["specs_analyzed"] = specs_analyzed_count
         diagnosis["specs_skipped"] = specs_skipped_count
         diagnosis["specs_total"] = total_specs_count
+        context.mark_dirty()
         context.save()
 
 
-def compare_spec_files(
+def compare_spec_batch(
     context: "LasvContext",
     crate: str,
     version: str,
-    path1: Optional[str],
-    path2: Optional[str],
+    path_pairs: list[tuple[Optional[str], Optional[str]]],
     prompt_name: str = "detailed",
-) -> SpecComparisonResult:
+) -> list[SpecComparisonResult]:
     """
-    Compare two paths to the same *.ads file.
+    Compare several pairs of paths to the same *.ads file.
 
-    One path may be None if the file is missing in one of the releases.
-    If not None, compares the content of the specs.
-    Returns: SpecComparisonResult with has_major, has_minor, sent_to_llm
+    One path of a pair may be None if the file is missing in one of the
+    releases. The content of all the pairs that need it is compared at once.
+    Returns: one SpecComparisonResult per pair, in the same order.
     """
-    has_major = False
-    has_minor = False
-    if path1 is None:
-        # File added in v2. Check if it's a private package first.
-        if path2 and is_private_package(path2):
-            # Private packages are not part of public API
-            return SpecComparisonResult(has_major, has_minor, False)
-        # File added in v2. Minor change (backward compatible addition).
-        if context.model is None and path2:
-            context.emit_change(crate, version, 'files',
-                                ChangeInfo(ChangeType.MINOR, 0, 0,
-                                        f"Public spec file added: {os.path.basename(path2)}",
-                                        path2, ""))
-            has_minor = True
-        return SpecComparisonResult(has_major, has_minor, False)
-
-    if path2 is None:
-        # File removed in v2. Check if it was a private package.
-        if path1 and is_private_package(path1):
-            # Private packages are not part of public API
-            return SpecComparisonResult(has_major, has_minor, False)
-        # File removed in v2. Major change (backward incompatible removal).
-        if context.model is None and path1:
-            context.emit_change(crate, version, 'files',
-                                ChangeInfo(ChangeType.MAJOR, 0, 0,
-                                           f"Public spec file removed: {os.path.basename(path1)}",
-                                           "", path1))
-            has_major = True
-        return SpecComparisonResult(has_major, has_minor, False)
-
-    # Both files exist - check privacy status
-    is_private_1 = is_private_package(path1)
-    is_private_2 = is_private_package(path2)
+    # Each file is stat'ed once, and byte-identical pairs, which need no
+    # further checks, are compared once here.
+    spec_files = [_stat_spec_files(*pair) for pair in path_pairs]
+
+    _prefetch_private_packages(context, spec_files)
+
+    results: list[Optional[SpecComparisonResult]] = [
+        _check_spec_files(context, crate, version, files)
+        for files in spec_files
+    ]
+    content_indices = [idx for idx, result in enumerate(results)
+                       if result is None]
+    if content_indices:
+        content_results = specs_module.compare_spec_contents(
+            context, crate, version,
+            [path_pairs[idx] for idx in content_indices], prompt_name
+        )
+        for idx, result in zip(content_indices, content_results):
+            results[idx] = result
+    return results
+
+
+def _prefetch_private_packages(
+    context: "LasvContext", spec_files: list["_SpecFiles"]
+) -> None:
+    """
+    Reading the spec headers is I/O bound: for larger batches, warm the
+    is_private_package cache concurrently, so that the pairs can then be
+    checked in order. Added and removed specs are only checked without a
+    model.
+    """
+    to_scan = []
+    for files in spec_files:
+        existing = files.existing()
+        if not files.identical and (
+            context.model is None or len(existing) == 2
+        ):
+            to_scan.extend(existing)
+    if len(to_scan) >= MIN_PREFETCH_PATHS:
+        workers = min(MAX_SCAN_WORKERS, len(to_scan))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_is_private_package, *zip(*to_scan)))
+
+
+def _check_spec_files(
+    context: "LasvContext",
+    crate: str,
+    version: str,
+    files: "_SpecFiles",
+) -> Optional[SpecComparisonResult]:
+    """
+    Handle the cases of compare_spec_batch that do not need the content of
+    the specs: missing, identical, private and large files.
+    Returns None when both specs are public and their content must be
+    compared.
+    """
+    if files.stat1 is None or files.stat2 is None:
+        return _check_spec_file_presence(context, crate, version, files)
+    path1, path2 = files.path1, files.path2
+
+    # Both files exist. Unchanged files need no further checks.
+    if files.identical:
+        print(f"         Identical spec in {specs_module.spec_label(path2)}")
+        return SpecComparisonResult(False, False, False)
+
+    # Check privacy status
+    is_private_1 = _is_private_package(path1, files.stat1)
+    is_private_2 = _is_private_package(path2, files.stat2)
 
     # If both exist and private, no change.
     if is_private_1 and is_private_2:
         print(f"         Skipping private spec in {os.path.basename(path2)}")
-        return SpecComparisonResult(has_major, has_minor, False)
+        return SpecComparisonResult(False, False, False)
 
     # if file exists in both, but is private only in one case, this affects the public API.
     if is_private_1 != is_private_2:
@@ -273,19 +433,133 @@ def compare_spec_files(
                             ChangeInfo(change_type, 0, 0,
                                        f"Public spec file {action}: {os.path.basename(path2)}",
                                        path2, path1))
-        if change_type == ChangeType.MAJOR:
-            has_major = True
-        else:
-            has_minor = True
-        return SpecComparisonResult(has_major, has_minor, False)
+        return SpecComparisonResult(change_type == ChangeType.MAJOR,
+                                    change_type == ChangeType.MINOR, False)
 
-    # Both exist and are public, so we will compare their content.
-    result = specs_module.compare_spec_content(
-        context, crate, version, path1, path2, prompt_name
+    # Both exist and are public, so their content must be compared, unless
+    # they are too large to be sent to the model.
+    if context.model and (
+        specs_module.is_large_spec(path1, files.stat1[1])
+        or specs_module.is_large_spec(path2, files.stat2[1])
+    ):
+        return SpecComparisonResult(False, False, False)
+    return None
+
+
+def _check_spec_file_presence(
+    context: "LasvContext",
+    crate: str,
+    version: str,
+    files: "_SpecFiles",
+) -> SpecComparisonResult:
+    """
+    Handle a spec file that is missing in one of the releases.
+    """
+    # Added and removed files are only reported by the 'files' diagnosis
+    if context.model is not None:
+        return SpecComparisonResult(False, False, False)
+
+    path1, path2 = files.path1, files.path2
+    if files.stat1 is None:
+        # File added in v2. Check if it's a private package first.
+        if _is_private_package(path2, files.stat2):
+            # Private packages are not part of public API
+            return SpecComparisonResult(False, False, False)
+        # File added in v2. Minor change (backward compatible addition).
+        context.emit_change(crate, version, 'files',
+                            ChangeInfo(ChangeType.MINOR, 0, 0,
+                                       f"Public spec file added: {os.path.basename(path2)}",
+                                       path2, ""))
+        return SpecComparisonResult(False, True, False)
+
+    # File removed in v2. Check if it was a private package.
+    if _is_private_package(path1, files.stat1):
+        # Private packages are not part of public API
+        return SpecComparisonResult(False, False, False)
+    # File removed in v2. Major change (backward incompatible removal).
+    context.emit_change(crate, version, 'files',
+                        ChangeInfo(ChangeType.MAJOR, 0, 0,
+                                   f"Public spec file removed: {os.path.basename(path1)}",
+                                   "", path1))
+    return SpecComparisonResult(True, False, False)
+
+
+@dataclass(slots=True, frozen=True)
+class _SpecFiles:
+    """
+    A spec file in two releases, with the stat keys (modification time and
+    size) of its paths, which are None where the file does not exist.
+    """
+    path1: Optional[str]
+    path2: Optional[str]
+    stat1: Optional[tuple[int, int]]
+    stat2: Optional[tuple[int, int]]
+    identical: bool
+
+    def existing(self) -> list[tuple[str, tuple[int, int]]]:
+        """
+        Return the path and stat key of each file that exists.
+        """
+        return [
+            (path, stat)
+            for path, stat in ((self.path1, self.stat1),
+                               (self.path2, self.stat2))
+            if stat is not None
+        ]
+
+
+def _stat_spec_files(
+    path1: Optional[str], path2: Optional[str]
+) -> _SpecFiles:
+    """
+    Stat the paths of a spec file in two releases, and compare the files if
+    both exist. Files that cannot be stat'ed are handled as missing.
+    """
+    stat1 = _stat_key(path1)
+    stat2 = _stat_key(path2)
+    identical = (
+        stat1 is not None and stat2 is not None
+        and stat1[1] == stat2[1]
+        and _same_content(path1, path2, stat1, stat2)
     )
-    has_major = has_major or result.has_major
-    has_minor = has_minor or result.has_minor
-    return SpecComparisonResult(has_major, has_minor, result.sent_to_llm)
+    return _SpecFiles(path1, path2, stat1, stat2, identical)
+
+
+def _stat_key(path: Optional[str]) -> Optional[tuple[int, int]]:
+    """
+    Return the modification time and size of a file, or None if it does not
+    exist.
+    """
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=4096)
+def _same_content(
+    path1: str,
+    path2: str,
+    _stat1: tuple[int, int],
+    _stat2: tuple[int, int],
+) -> bool:
+    """
+    Return whether two files have the same content. The stat keys are only
+    part of the cache key.
+    """
+    try:
+        with open(path1, 'rb') as f1, open(path2, 'rb') as f2:
+            while True:
+                chunk1 = f1.read(COMPARE_CHUNK_BYTES)
+                if chunk1 != f2.read(COMPARE_CHUNK_BYTES):
+                    return False
+                if not chunk1:
+                    return True
+    except OSError:
+        return False
 
 
 def retrieve(crate, version: str) -> None:
@@ -304,7 +578,7 @@ def retrieve(crate, version: str) -> None:
 
         print(f"      Retrieving {crate}={version}...")
         subprocess.run(
-            ["alr", "-C", parent_path, "get", "--only", f"{crate}={version}"],
+            [ALR, "-C", parent_path, "get", "--only", f"{crate}={version}"],
             check=True,
             capture_output=True,
             text=True
@@ -319,6 +593,24 @@ def retrieve(crate, version: str) -> None:
         return
 
 
+def retrieve_all(crate: str, versions: list[str]) -> None:
+    """
+    Retrieve several releases of a crate, see retrieve(). Downloads are
+    network-bound, so up to MAX_RETRIEVE_WORKERS of them run at once.
+    Duplicate versions are retrieved only once.
+    """
+    unique_versions = list(dict.fromkeys(versions))
+    if len(unique_versions) <= 1:
+        for version in unique_versions:
+            retrieve(crate, version)
+        return
+
+    workers = min(MAX_RETRIEVE_WORKERS, len(unique_versions))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Consume the results so that unexpected errors are raised here
+        list(executor.map(lambda v: retrieve(crate, v), unique_versions))
+
+
 def fix_version(v: str) -> str:
     """
     Fix version string to ensure it has proper format for alr.
@@ -333,23 +625,24 @@ def fix_version(v: str) -> str:
     return v
 
 
+@lru_cache(maxsize=4096)
 def find_previous_version(crate: str, version: str) -> Optional[str]:
     """
     Find the previous version of a crate before the given version.
     Returns the previous version string, or None if not found.
+    Results are cached for the duration of the run.
     """
     try:
         prev_result = subprocess.run(
-            ["alr", "--format", "show", f"{crate}<{version}"],
+            [ALR, "--format", "show", f"{crate}<{version}"],
             capture_output=True,
-            text=True,
             check=True,
         )
 
-        if prev_result.stdout.strip() == "":
+        if not prev_result.stdout.strip():
             return None
 
-        prev_info = json.loads(prev_result.stdout)
+        prev_info = fastjson.loads(prev_result.stdout)
         return fix_version(prev_info.get("version"))
 
     except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as e:
@@ -438,10 +731,12 @@ def find_pairs(context: "LasvContext", crate: str, find_pairs_only: bool = False
         return (found_count, major_count, minor_count, patch_count)
 
     v2 = last_version
+    pairs = []
+    stopped_early = False
 
-    first_retrieved = False
-
-    # Loop until no more previous versions
+    # Select pairs first, looping until no more previous versions. Which
+    # pairs are analyzed depends only on their bump type, so this needs no
+    # downloads and all releases can then be retrieved concurrently.
     while True:
         # Find previous release info with `alr show`
         v1 = find_previous_version(crate, v2)
@@ -449,7 +744,7 @@ def find_pairs(context: "LasvContext", crate: str, find_pairs_only: bool = False
         if v1 is None:
             if found_count == 0:
                 print(f"   No release <{v2} found.")
-            return (found_count, major_count, minor_count, patch_count)
+            break
 
         # Skip pairs where v1 is pre-1.0.0 (those don't have to respect semver)
         v1_parts = v1.split('.')
@@ -501,82 +796,101 @@ def find_pairs(context: "LasvContext", crate: str, find_pairs_only: bool = False
 
         print(f"   Found pair: {colors.version(v1)} -> {colors.version(v2)}")
         found_count += 1
-        if not first_retrieved:
-            retrieve(crate, v2)
-            first_retrieved = True
-        retrieve(crate, v1)
+        pairs.append((v1, v2))
 
+        if not context.all_releases and major_found and minor_found and patch_found:
+            stopped_early = True
+            break
+
+        v2 = v1
+
+    retrieve_all(crate, [v for pair in pairs for v in reversed(pair)])
+
+    for v1, v2 in pairs:
         # If find_pairs_only is True, skip analysis but store releases
         if find_pairs_only:
             context.ensure_release(crate, v2)
             context.ensure_release(crate, v1)
-            v2 = v1
-            continue
+        else:
+            _analyze_pair(context, crate, v1, v2, redo)
 
-        # Perform the actual comparison of specs
-        # Check if 'files' diagnosis already exists for this version
-        files_diagnosis_exists = (
-            'releases' in context.data['crates'][crate] and
-            v2 in context.data['crates'][crate]['releases'] and
-            'diagnosis' in context.data['crates'][crate]['releases'][v2] and
-            'files' in context.data['crates'][crate]['releases'][v2]['diagnosis']
-        )
+    if stopped_early:
+        print(colors.yellow(
+            "   Stopping early: first major, minor, and patch bumps processed."
+        ))
 
-        # If redo is True, remove existing diagnosis
-        if redo and files_diagnosis_exists and not context.model:
-            del context.data['crates'][crate]['releases'][v2]['diagnosis']['files']
-            files_diagnosis_exists = False
-            print(f"      Removed existing 'files' diagnosis")
+    return (found_count, major_count, minor_count, patch_count)
 
-        try:
-            if not files_diagnosis_exists:
-                context.start_diagnosis(crate, v2, "files", from_version=v1)
-                compare_specs(context, crate, v1, v2, "files")
-                context.finish_diagnosis(crate, v1, v2, "files")
-            else:
-                print(f"      Skipping 'files' diagnosis (already exists)")
-        except Exception as e:
-            print(f"      Error during file-based diagnosis: {e}")
-            # Set diagnosis to error and store the error as the reason
-            context.finish_diagnosis_with_error(crate, v2, "files", str(e))
-
-        # If a model is provided, check if model diagnosis exists and run it if not
-        if context.model:
-            base_model_key = context.model_key or context.model
-            prompt_name = context.prompt_name
-            analyzer_key = f"{base_model_key}({prompt_name})"
-            model_diagnosis_exists = (
-                'releases' in context.data['crates'][crate] and
-                v2 in context.data['crates'][crate]['releases'] and
-                'diagnosis' in context.data['crates'][crate]['releases'][v2] and
-                analyzer_key in context.data['crates'][crate]['releases'][v2]['diagnosis']
-            )
 
-            # If redo is True, remove existing model diagnosis
-            if redo and model_diagnosis_exists:
-                del context.data['crates'][crate]['releases'][v2]['diagnosis'][analyzer_key]
-                model_diagnosis_exists = False
-                print(f"      Removed existing '{context.model}' diagnosis")
+def _release_diagnoses(
+    context: "LasvContext", crate: str, version: str
+) -> dict:
+    """
+    Return the diagnoses stored for a release, or an empty dict if none.
+    """
+    return (
+        context.data['crates'][crate]
+        .get('releases', {})
+        .get(version, {})
+        .get('diagnosis', {})
+    )
 
-            try:
-                if not model_diagnosis_exists:
-                    context.start_diagnosis(crate, v2, analyzer_key, from_version=v1)
-                    compare_specs(context, crate, v1, v2, analyzer_key, prompt_name)
-                    context.finish_diagnosis(crate, v1, v2, analyzer_key)
-                else:
-                    print(f"      Skipping '{context.model}' diagnosis (already exists)")
-            except Exception as e:
-                print(f"      Error during model-based diagnosis: {e}")
-                # Set diagnosis to error and store the error as the reason
-                context.finish_diagnosis_with_error(crate, v2,
-                                                    analyzer_key, str(e))
 
-        if not context.all_releases and major_found and minor_found and patch_found:
-            print(colors.yellow(
-                "   Stopping early: first major, minor, and patch bumps processed."
-            ))
-            break
+def _analyze_pair(
+    context: "LasvContext", crate: str, v1: str, v2: str, redo: bool
+) -> None:
+    """
+    Run the 'files' diagnosis, and the model one if a model is set, for a
+    release pair whose sources have already been retrieved.
+    If redo is True, remove existing diagnosis and redo it.
+    """
+    # Perform the actual comparison of specs
+    # Check if 'files' diagnosis already exists for this version
+    diagnoses = _release_diagnoses(context, crate, v2)
+    files_diagnosis_exists = 'files' in diagnoses
 
-        v2 = v1
+    # If redo is True, remove existing diagnosis
+    if redo and files_diagnosis_exists and not context.model:
+        del diagnoses['files']
+        files_diagnosis_exists = False
+        print(f"      Removed existing 'files' diagnosis")
 
-    return (found_count, major_count, minor_count, patch_count)
+    try:
+        if not files_diagnosis_exists:
+            context.start_diagnosis(crate, v2, "files", from_version=v1)
+            compare_specs(context, crate, v1, v2, "files")
+            context.finish_diagnosis(crate, v1, v2, "files")
+        else:
+            print(f"      Skipping 'files' diagnosis (already exists)")
+    except Exception as e:
+        print(f"      Error during file-based diagnosis: {e}")
+        # Set diagnosis to error and store the error as the reason
+        context.finish_diagnosis_with_error(crate, v2, "files", str(e))
+
+    # If a model is provided, check if model diagnosis exists and run it if not
+    if context.model:
+        base_model_key = context.model_key or context.model
+        prompt_name = context.prompt_name
+        analyzer_key = f"{base_model_key}({prompt_name})"
+        # The 'files' diagnosis may have created the release entry
+        diagnoses = _release_diagnoses(context, crate, v2)
+        model_diagnosis_exists = analyzer_key in diagnoses
+
+        # If redo is True, remove existing model diagnosis
+        if redo and model_diagnosis_exists:
+            del diagnoses[analyzer_key]
+            model_diagnosis_exists = False
+            print(f"      Removed existing '{context.model}' diagnosis")
+
+        try:
+            if not model_diagnosis_exists:
+                context.start_diagnosis(crate, v2, analyzer_key, from_version=v1)
+                compare_specs(context, crate, v1, v2, analyzer_key, prompt_name)
+                context.finish_diagnosis(crate, v1, v2, analyzer_key)
+            else:
+                print(f"      Skipping '{context.model}' diagnosis (already exists)")
+        except Exception as e:
+            print(f"      Error during model-based diagnosis: {e}")
+            # Set diagnosis to error and store the error as the reason
+            context.finish_diagnosis_with_error(crate, v2,
+                                                analyzer_key, str(e))
@@ -4,12 +4,45 @@ This module is responsible for comparing the content of two Ada package specific
 import os
 import re
 from dataclasses import dataclass
+from pathlib import Path
 from lasv.context import LasvContext, ChangeType, ChangeInfo
 from lasv import llm
 from lasv import colors
 
 MAX_SPEC_BYTES = 64 * 1024
 
+# Default upper bound on the combined size of the two (uncommented) specs
+# sent in a single query; beyond it the cost grows while the answers degrade
+DEFAULT_MAX_QUERY_CHARS = 80000
+
+
+def _max_query_chars() -> int:
+    """
+    Return the query size limit, which can be overridden by setting the
+    LASV_MAX_SPEC_CHARS environment variable to a number of characters.
+    Invalid values are reported and the default is used instead.
+    """
+    value = os.environ.get("LASV_MAX_SPEC_CHARS")
+    if value is None:
+        return DEFAULT_MAX_QUERY_CHARS
+    try:
+        return int(value)
+    except ValueError:
+        print(colors.yellow(
+            f"Warning: invalid LASV_MAX_SPEC_CHARS value {value!r}, "
+            f"using {DEFAULT_MAX_QUERY_CHARS}"
+        ))
+        return DEFAULT_MAX_QUERY_CHARS
+
+
+MAX_QUERY_CHARS = _max_query_chars()
+
+# Matches either a string literal (group 1, kept) or a comment (removed)
+COMMENT_RE = re.compile(r'("(?:[^"\n]|"")*")|--[^\n]*')
+
+# One change reported by the LLM: severity, line, column and description
+CHANGE_LINE_RE = re.compile(r"(MAJOR|minor) \((\d+), (\d+)\): (.*)")
+
 
 @dataclass
 class SpecComparisonResult:
@@ -19,92 +52,96 @@ class SpecComparisonResult:
     sent_to_llm: bool
 
 
+@dataclass
+class _SpecResponse:
+    """LLM response to the comparison of two spec files."""
+    path1: str
+    path2: str
+    content: str
+    usage: llm.LlmUsage
+
+
 def _get_public_spec(path: str) -> str:
     """
-    Return the public part of a spec file.
+    Return the content of a spec file to be compared. The whole file is
+    used, including its private part.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    return Path(path).read_text(encoding="utf-8", errors="replace")
 
-    return '\n'.join(lines)
 
-    uncommented_lines = [re.sub(r"--.*", "", line) for line in lines]
+def spec_label(path: str) -> str:
+    """
+    Return the parent folder and file name of a spec, as shown in messages.
+    """
+    parent, filename = os.path.split(path)
+    return f"{os.path.basename(parent)}/{filename}"
 
-    private_line_index = -1
-    for i, line in enumerate(uncommented_lines):
-        if re.search(r"\bprivate\b", line, re.IGNORECASE):
-            private_line_index = i
-            break
 
-    if private_line_index != -1:
-        # Find the column index of "private" in the uncommented line
-        private_match_in_uncommented = re.search(
-            r"\bprivate\b", uncommented_lines[private_line_index], re.IGNORECASE
-        )
-        col_index = private_match_in_uncommented.start()
+def _strip_comments(content: str) -> str:
+    """
+    Remove comments and trailing whitespace from Ada source, keeping the
+    line structure so that line and column numbers remain valid.
+    """
+    uncommented = COMMENT_RE.sub(lambda m: m.group(1) or "", content)
+    return "\n".join(line.rstrip() for line in uncommented.split("\n"))
 
-        # Reconstruct the content up to the "private" keyword
-        result = ""
-        for i in range(private_line_index):
-            result += lines[i]
-        result += lines[private_line_index][:col_index]
-        return result
 
-    return "".join(lines)
+def _canonical_spec(content: str) -> str:
+    """
+    Return a form of uncommented Ada source that ignores whitespace layout
+    and casing, which never affect the API (Ada is case-insensitive).
+    """
+    return " ".join(content.lower().split())
 
 
-def compare_spec_content(
-    context: LasvContext,
-    crate: str,
-    version: str,
-    path1: str,
-    path2: str,
-    prompt_name: str = "detailed",
-) -> SpecComparisonResult:
+def is_large_spec(path: str, size: int) -> bool:
+    """
+    Return whether a spec file of the given size is too large to be sent to
+    the LLM, reporting it if so.
     """
-    Compare the content of two existing specification files using an LLM.
+    if size <= MAX_SPEC_BYTES:
+        return False
+    print(colors.yellow(
+        f"         Skipping large spec (>64k): {os.path.basename(path)}"
+    ))
+    return True
 
-    :param context: The application context for emitting changes.
-    :param path1: Absolute path to the old specification file.
-    :param path2: Absolute path to the new specification file.
-    :param prompt_name: Name of the prompt to use for LLM comparison.
-    :return: SpecComparisonResult with has_major, has_minor, sent_to_llm
+
+def _prepare_spec_content(path1: str, path2: str) -> tuple[str, str] | None:
     """
-    if not context.model:
-        return SpecComparisonResult(False, False, False)
+    Read the two specs to be sent to the LLM, without comments. Byte-identical
+    and large specs are expected to have been left out already.
+    Returns None when they must not be sent (identical once comments,
+    whitespace and casing are ignored, or too large together).
+    """
+    spec1_public = _strip_comments(_get_public_spec(path1))
+    spec2_public = _strip_comments(_get_public_spec(path2))
+    if _canonical_spec(spec1_public) == _canonical_spec(spec2_public):
+        print(f"         Only comment, whitespace or casing changes in "
+              f"{spec_label(path2)}")
+        return None
 
-    try:
-        if os.path.getsize(path1) > MAX_SPEC_BYTES:
-            print(colors.yellow(
-                f"         Skipping large spec (>64k): {os.path.basename(path1)}"
-            ))
-            return SpecComparisonResult(False, False, False)
-        if os.path.getsize(path2) > MAX_SPEC_BYTES:
-            print(colors.yellow(
-                f"         Skipping large spec (>64k): {os.path.basename(path2)}"
-            ))
-            return SpecComparisonResult(False, False, False)
-    except OSError as e:
+    query_chars = len(spec1_public) + len(spec2_public)
+    if query_chars > MAX_QUERY_CHARS:
         print(colors.yellow(
-            f"         Skipping spec due to size check error: {e}"
+            f"         Skipping large spec pair ({query_chars} > "
+            f"{MAX_QUERY_CHARS} chars): {os.path.basename(path2)}"
         ))
-        return SpecComparisonResult(False, False, False)
+        return None
 
-    spec1_public = _get_public_spec(path1)
-    spec2_public = _get_public_spec(path2)
+    return spec1_public, spec2_public
 
-    if spec1_public == spec2_public:
-        # Include parent folder in the output
-        parent_folder = os.path.basename(os.path.dirname(path2))
-        filename = os.path.basename(path2)
-        print(f"         Identical spec in {parent_folder}/{filename}")
-        return SpecComparisonResult(False, False, False)
 
-    response, usage = llm.query_model(
-        context.model, spec1_public, spec2_public, prompt_name
-    )
-    base_model_name = context.model_key or context.model
-    analyzer_name = f"{base_model_name}({prompt_name})"
+def _record_llm_usage(
+    context: LasvContext,
+    crate: str,
+    version: str,
+    analyzer_name: str,
+    usage: llm.LlmUsage,
+) -> None:
+    """
+    Store the usage of an LLM query and report its cost.
+    """
     _total_spec_chars, _total_system_chars, total_cost = context.add_llm_usage(
         crate,
         version,
@@ -123,17 +160,28 @@ def compare_spec_content(
         total_cost_text = f"accumulated cost: ${total_cost:.5f}"
     print(colors.lilac(f"         {cost_text}, {total_cost_text}"))
 
+
+def _record_spec_response(
+    context: LasvContext,
+    crate: str,
+    version: str,
+    analyzer_name: str,
+    response: _SpecResponse,
+) -> SpecComparisonResult:
+    """
+    Store the LLM usage and the changes reported in an LLM response.
+    """
+    _record_llm_usage(context, crate, version, analyzer_name, response.usage)
+
     first_change = True
     has_major = False
     has_minor = False
-    for line in response.splitlines():
-        match = re.match(r"(MAJOR|minor) \((\d+), (\d+)\): (.*)", line)
+    for line in response.content.splitlines():
+        match = CHANGE_LINE_RE.match(line)
         if match:
             # Print filename before the first change
             if first_change:
-                parent_folder = os.path.basename(os.path.dirname(path2))
-                filename = os.path.basename(path2)
-                print(f"         {parent_folder}/{filename}:")
+                print(f"         {spec_label(response.path2)}:")
                 first_change = False
 
             severity_str, line_num, col_num, description = match.groups()
@@ -157,16 +205,53 @@ def compare_spec_content(
                     int(line_num),
                     int(col_num),
                     description,
-                    path2,
-                    path1,
+                    response.path2,
+                    response.path1,
                 ),
             )
 
     if first_change:
-        # Include parent folder in the output
-        parent_folder = os.path.basename(os.path.dirname(path2))
-        filename = os.path.basename(path2)
-        print(f"         No semantic changes in {parent_folder}/{filename}")
-        parent_folder = os.path.basename(os.path.dirname(path2))
+        print(f"         No semantic changes in {spec_label(response.path2)}")
 
     return SpecComparisonResult(has_major, has_minor, True)
+
+
+def compare_spec_contents(
+    context: LasvContext,
+    crate: str,
+    version: str,
+    path_pairs: list[tuple[str, str]],
+    prompt_name: str = "detailed",
+) -> list[SpecComparisonResult]:
+    """
+    Compare the content of several pairs of existing specification files
+    using an LLM. The LLM is queried concurrently for all pairs, but the
+    results are recorded in order from the calling thread.
+
+    :param context: The application context for emitting changes.
+    :param path_pairs: (old, new) absolute paths of the specification files.
+    :param prompt_name: Name of the prompt to use for LLM comparison.
+    :return: One SpecComparisonResult per pair, in the same order.
+    """
+    results = [
+        SpecComparisonResult(False, False, False) for _ in path_pairs
+    ]
+    if not context.model:
+        return results
+
+    pending = []
+    for idx, (path1, path2) in enumerate(path_pairs):
+        contents = _prepare_spec_content(path1, path2)
+        if contents is not None:
+            pending.append((idx, contents))
+
+    responses = llm.query_models(
+        context.model, [contents for _, contents in pending], prompt_name
+    )
+    analyzer_name = f"{context.model_key or context.model}({prompt_name})"
+    for (idx, _), (content, usage) in zip(pending, responses):
+        results[idx] = _record_spec_response(
+            context, crate, version, analyzer_name,
+            _SpecResponse(*path_pairs[idx], content, usage),
+        )
+    return results
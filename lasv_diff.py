@@ -18,6 +18,7 @@ import os
 import re
 import subprocess
 import sys
+from operator import itemgetter
 from typing import Optional, List, Tuple
 
 
@@ -32,10 +33,12 @@ def parse_version(version_str: str) -> Tuple[int, ...]:
         return (0,)
 
 
-def get_versions_from_disk(crate: str) -> List[Tuple[str, str]]:
+def get_versions_from_disk(
+    crate: str
+) -> List[Tuple[str, str, Tuple[int, ...]]]:
     """
     Get all versions of a crate from the releases folder on disk.
-    Returns a list of tuples: (version_string, full_path)
+    Returns a list of tuples: (version_string, full_path, parsed_version)
     Sorted by version in ascending order.
     """
     releases_dir = os.path.join("releases", crate)
@@ -53,10 +56,10 @@ def get_versions_from_disk(crate: str) -> List[Tuple[str, str]]:
             match = pattern.match(entry)
             if match:
                 version = match.group(1)
-                versions.append((version, full_path))
+                versions.append((version, full_path, parse_version(version)))
 
     # Sort by version
-    versions.sort(key=lambda x: parse_version(x[0]))
+    versions.sort(key=itemgetter(2))
 
     return versions
 
@@ -74,17 +77,12 @@ def find_previous_version_on_disk(crate: str, version: str) -> Optional[Tuple[st
 
     target_version_tuple = parse_version(version)
 
-    # Find all versions less than the target version
-    previous_versions = [
-        (v, p) for v, p in versions
-        if parse_version(v) < target_version_tuple
-    ]
-
-    if not previous_versions:
-        return None
-
     # Return the highest version that's still less than target
-    return previous_versions[-1]
+    for v, p, version_tuple in reversed(versions):
+        if version_tuple < target_version_tuple:
+            return (v, p)
+
+    return None
 
 
 def find_version_path_on_disk(crate: str, version: str) -> Optional[str]:
@@ -94,7 +92,7 @@ def find_version_path_on_disk(crate: str, version: str) -> Optional[str]:
     """
     versions = get_versions_from_disk(crate)
 
-    for v, path in versions:
+    for v, path, _ in versions:
         if v == version:
             return path
 
@@ -134,7 +132,7 @@ def main():
         print(f"Error: Version {current_version} not found on disk for crate '{crate_name}'.")
         print(f"Available versions:")
         versions = get_versions_from_disk(crate_name)
-        for v, _ in versions:
+        for v, _, _ in versions:
             print(f"  - {v}")
         sys.exit(1)
 
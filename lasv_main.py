@@ -82,7 +82,8 @@ def lasv_main():
     if args.fix:
         fixed_count = fix_context_data(context)
         if fixed_count:
-            context.save()
+            context.mark_dirty()
+            context.save(force=True)
         print(f"Fixed {fixed_count} key(s).")
         return
 
@@ -103,7 +104,7 @@ def lasv_main():
                    list_only=args.list_only,
                    find_pairs=args.find_pairs,
                    redo=args.redo)
-    context.save()
+    context.save(force=True)
 
 # Program entry point
 if __name__ == "__main__":
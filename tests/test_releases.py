@@ -0,0 +1,43 @@
+"""
+Tests for the private package detection in lasv.releases.
+"""
+import unittest
+
+from lasv.releases import SPEC_HEAD_BYTES, _declares_private_package
+
+
+class DeclaresPrivatePackageTest(unittest.TestCase):
+    """Tests for _declares_private_package."""
+
+    def test_private_package(self) -> None:
+        """A private package is detected."""
+        self.assertTrue(
+            _declares_private_package(b"private package P is\nend P;\n", True)
+        )
+
+    def test_public_package(self) -> None:
+        """A public package is not private."""
+        self.assertFalse(
+            _declares_private_package(b"package P is\nend P;\n", True)
+        )
+
+    def test_private_with(self) -> None:
+        """A private with-clause does not make the package private."""
+        self.assertFalse(_declares_private_package(
+            b"private with Foo;\npackage P is\nend P;\n", True
+        ))
+
+    def test_private_with_after_comment(self) -> None:
+        """A comment between 'private' and 'with' is still a with-clause."""
+        self.assertFalse(_declares_private_package(
+            b"private -- note\n with Foo;\npackage P is\nend P;\n", True
+        ))
+
+    def test_partial_read_ending_in_comment(self) -> None:
+        """A 'with' possibly cut off by a partial read leaves it undecided."""
+        content = b"private -- " + b"x" * SPEC_HEAD_BYTES
+        self.assertIsNone(_declares_private_package(content, False))
+
+
+if __name__ == "__main__":
+    unittest.main()